@@ -1,17 +1,28 @@
-import json
+import atexit
 import os
+import queue
 import re
+import sys
 import smtplib
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from dataclasses import dataclass, field, asdict
-from typing import Dict, List, Optional, Any, Tuple, Union
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Any, Set, Tuple, Union
 import pandas as pd
+import numpy as np
+import orjson
+from numba import njit, prange
+from rapidfuzz import fuzz, process
 import random
 from enum import Enum
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Literal
 import uuid
+from collections.abc import MutableMapping
 from enum import Enum
 
 # Enums for different types
@@ -21,13 +32,84 @@ candidate_status = Enum('CandidateStatus',
                        ['APPLIED', 'SCREENING', 'INTERVIEW_SCHEDULED', 'INTERVIEWED', 
                         'OFFERED', 'HIRED', 'REJECTED', 'WITHDRAWN'])
 
-@dataclass
+# Minimum token_set_ratio for two skill names to count as the same skill
+SKILL_MATCH_CUTOFF = 85
+
+# Maximum number of SMTP connections kept open for notifications
+SMTP_POOL_SIZE = 5
+
+# Default socket timeout in seconds for SMTP connections
+SMTP_TIMEOUT = 30
+
+# Seconds to wait after a change before writing dirty rows to disk
+FLUSH_DELAY = 0.5
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _score_rows(prof, years, rows, cols, group_ptr):
+    """Sum the best skill score in each required-skill group for the given rows
+
+    prof and years are the uint8 skill matrices, with years in tenths. cols
+    holds the matrix columns of every group back to back; group g spans
+    cols[group_ptr[g]:group_ptr[g + 1]].
+    """
+    totals = np.zeros(rows.shape[0], dtype=np.float32)
+    for i in prange(rows.shape[0]):
+        r = rows[i]
+        total = 0.0
+        for g in range(group_ptr.shape[0] - 1):
+            best = 0.0
+            for j in range(group_ptr[g], group_ptr[g + 1]):
+                c = cols[j]
+                # (prof / 5) * 0.6 + min(years / 10, 1) * 0.4, with years in tenths
+                score = prof[r, c] * 0.12 + min(years[r, c] * 0.004, 0.4)
+                if score > best:
+                    best = score
+            total += best
+        totals[i] = total
+    return totals
+
+@njit(parallel=True, cache=True)
+def _exact_score_rows(row_start, row_len, skill_cols, skill_prof, skill_years, rows, cols, group_ptr):
+    """Float64 rescoring of the given rows from their exact skill values
+
+    Row r's skills are entries row_start[r] to row_start[r] + row_len[r] of
+    skill_cols/skill_prof/skill_years. Repeats the operations of the Python
+    scoring formula, so results match it bit for bit.
+    """
+    totals = np.zeros(rows.shape[0], dtype=np.float64)
+    for i in prange(rows.shape[0]):
+        r = rows[i]
+        lo = row_start[r]
+        hi = lo + row_len[r]
+        total = 0.0
+        for g in range(group_ptr.shape[0] - 1):
+            found = False
+            best = 0.0
+            for j in range(group_ptr[g], group_ptr[g + 1]):
+                c = cols[j]
+                for k in range(lo, hi):
+                    if skill_cols[k] == c:
+                        score = (skill_prof[k] / 5) * 0.6 + min(skill_years[k] / 10, 1.0) * 0.4
+                        if not found or score > best:
+                            best = score
+                            found = True
+            if found:
+                total += best
+        totals[i] = total
+    return totals
+
+@dataclass(slots=True)
 class Skill:
     name: str
     years_experience: float
     proficiency: int  # 1-5 scale
+    _name_lc: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Interned lowercase name, used as the matching key
+        self._name_lc = sys.intern(self.name.lower())
 
-@dataclass
+@dataclass(slots=True)
 class Education:
     degree: str
     field: str
@@ -35,7 +117,7 @@ class Education:
     year_completed: int
     gpa: Optional[float] = None
 
-@dataclass
+@dataclass(slots=True)
 class WorkExperience:
     title: str
     company: str
@@ -44,7 +126,7 @@ class WorkExperience:
     description: str
     achievements: List[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class Candidate:
     candidate_id: str
     first_name: str
@@ -59,7 +141,12 @@ class Candidate:
     notes: List[Dict[str, str]] = field(default_factory=list)  # For recruiter notes
     resume_path: Optional[str] = None
 
-@dataclass
+    def __post_init__(self):
+        # Statuses read back from storage arrive as enum names
+        if isinstance(self.status, str):
+            self.status = candidate_status[self.status]
+
+@dataclass(slots=True)
 class JobPosition:
     position_id: str
     title: str
@@ -74,6 +161,13 @@ class JobPosition:
     salary_range: Optional[Dict[str, float]] = None
     open_date: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d"))
     close_date: Optional[str] = None
+
+    def __post_init__(self):
+        # Enum fields read back from storage arrive as enum names
+        if isinstance(self.experience_level, str):
+            self.experience_level = experience_level[self.experience_level]
+        if isinstance(self.status, str):
+            self.status = job_status[self.status]
     
     def to_dict(self):
         return {
@@ -87,6 +181,103 @@ class JobPosition:
             'close_date': self.close_date or ""
         }
 
+# (status name, [(skill name lowercased, years, proficiency)])
+CandidateSummary = Tuple[str, List[Tuple[str, float, int]]]
+
+class LazyCandidates(MutableMapping):
+    """Candidate mapping that loads full records on first access
+
+    Every candidate has a summary holding only the fields matching needs,
+    taken when the candidate was last stored. The full Candidate (education,
+    experience, notes, ...) is fetched by id the first time it is looked up
+    and cached afterwards. Storing or deleting a candidate calls
+    on_change(candidate_id, previous summary or None).
+    """
+
+    def __init__(self, fetch: Callable[[str], 'Candidate'],
+                 on_change: Callable[[str, Optional[CandidateSummary]], None]):
+        self._fetch = fetch
+        self._on_change = on_change
+        self._summaries: Dict[str, CandidateSummary] = {}
+        self._loaded: Dict[str, Candidate] = {}
+
+    def add_summary(self, candidate_id: str, summary: CandidateSummary):
+        """Register a stored candidate without loading its full record"""
+        self._summaries[candidate_id] = summary
+
+    def summary(self, candidate_id: str) -> CandidateSummary:
+        """Get the matching fields as of the last time the candidate was stored"""
+        return self._summaries[candidate_id]
+
+    def __getitem__(self, candidate_id: str) -> 'Candidate':
+        candidate = self._loaded.get(candidate_id)
+        if candidate is None:
+            if candidate_id not in self._summaries:
+                raise KeyError(candidate_id)
+            candidate = self._loaded[candidate_id] = self._fetch(candidate_id)
+        return candidate
+
+    def __setitem__(self, candidate_id: str, candidate: 'Candidate'):
+        # The caller may have edited this very object, so the previous summary
+        # comes from the snapshot rather than the record
+        previous = self._summaries.get(candidate_id)
+        self._summaries[candidate_id] = (
+            candidate.status.name,
+            [(s._name_lc, s.years_experience, s.proficiency) for s in candidate.skills]
+        )
+        self._loaded[candidate_id] = candidate
+        self._on_change(candidate_id, previous)
+
+    def __delitem__(self, candidate_id: str):
+        previous = self.summary(candidate_id)
+        del self._summaries[candidate_id]
+        self._loaded.pop(candidate_id, None)
+        self._on_change(candidate_id, previous)
+
+    def __contains__(self, candidate_id: object) -> bool:
+        return candidate_id in self._summaries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._summaries)
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+class TrackedPositions(MutableMapping):
+    """Position mapping that reports every store and delete
+
+    Storing or deleting a position calls on_change(position_id); positions
+    read from the database are registered with load() without a report.
+    """
+
+    def __init__(self, on_change: Callable[[str], None]):
+        self._on_change = on_change
+        self._positions: Dict[str, JobPosition] = {}
+
+    def load(self, position_id: str, position: 'JobPosition'):
+        """Register a stored position without reporting it"""
+        self._positions[position_id] = position
+
+    def __getitem__(self, position_id: str) -> 'JobPosition':
+        return self._positions[position_id]
+
+    def __setitem__(self, position_id: str, position: 'JobPosition'):
+        self._positions[position_id] = position
+        self._on_change(position_id)
+
+    def __delitem__(self, position_id: str):
+        del self._positions[position_id]
+        self._on_change(position_id)
+
+    def __contains__(self, position_id: object) -> bool:
+        return position_id in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
 class HRAssistant:
     def __init__(self, data_dir: str = "hr_data", smtp_config: Optional[Dict] = None):
         """
@@ -104,148 +295,708 @@ class HRAssistant:
                         }
         """
         self.data_dir = data_dir
-        self.candidates: Dict[str, Candidate] = {}
-        self.positions: Dict[str, JobPosition] = {}
-        self.interviews: List[Dict] = []
+        self.candidates = LazyCandidates(self._fetch_candidate, self._candidate_changed)
+        self.positions = TrackedPositions(self._position_changed)
+        self.interviews: Dict[str, Dict] = {}
+        self._interviews_by_candidate: Dict[str, List[str]] = {}
+        self._interviews_by_position: Dict[str, List[str]] = {}
         self.smtp_config = smtp_config
-        
+
+        # Pool of authenticated SMTP connections, opened on demand. Each
+        # connection in use or idle holds one of the SMTP_POOL_SIZE slots.
+        self._smtp_pool: queue.Queue = queue.Queue()
+        self._smtp_slots = threading.BoundedSemaphore(SMTP_POOL_SIZE)
+
+        # Dense uint8 candidate x skill matrices used for matching. Built on the
+        # first match after load, then kept up to date as candidates change;
+        # rows and columns past the current counts are spare capacity.
+        self._skill_index: Dict[str, int] = {}
+        self._skill_names: List[str] = []
+        self._fuzzy_cache: Dict[str, np.ndarray] = {}
+        self._position_req: Dict[str, Tuple] = {}
+        self._prof_mat: np.ndarray = np.zeros((0, 0), dtype=np.uint8)
+        self._years_mat: np.ndarray = np.zeros((0, 0), dtype=np.uint8)
+        self._cand_ids: List[str] = []
+        self._cand_row: Dict[str, int] = {}
+        self._cand_df: pd.DataFrame = pd.DataFrame()
+        # Exact skill values per matrix row, for rescoring near the top_n cut-off:
+        # row r owns entries _row_start[r]:_row_start[r] + _row_len[r] of the pool
+        self._row_start: np.ndarray = np.zeros(0, dtype=np.intp)
+        self._row_len: np.ndarray = np.zeros(0, dtype=np.intp)
+        self._exact_cols: np.ndarray = np.zeros(0, dtype=np.intp)
+        self._exact_prof: np.ndarray = np.zeros(0, dtype=np.float64)
+        self._exact_years: np.ndarray = np.zeros(0, dtype=np.float64)
+        self._exact_used = 0
+        self._skill_matrix_stale = True
+
+        # Inverted index used to prune the match candidate pool
+        self._skill_to_candidates: Dict[str, Set[str]] = {}
+
         # Create data directory if it doesn't exist
         os.makedirs(data_dir, exist_ok=True)
         os.makedirs(os.path.join(data_dir, "resumes"), exist_ok=True)
+
+        # SQLite store; WAL keeps single-row writes cheap
+        self._conn = sqlite3.connect(os.path.join(data_dir, "hr.db"), isolation_level=None,
+                                     check_same_thread=False)
+        self._db_lock = threading.RLock()
+
+        # Changed rows are written in batches by flush(), in insertion order
+        self._dirty_candidates: Dict[str, None] = {}
+        self._dirty_positions: Dict[str, None] = {}
+        self._save_pending = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._bulk_depth = 0
+        self._closed = False
+        self._init_db()
         
         # Load existing data
         self._load_data()
+        _open_assistants.add(self)
     
+    def _init_db(self):
+        """Configure the SQLite connection and create tables if needed"""
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS candidates (
+                candidate_id TEXT PRIMARY KEY,
+                status TEXT,
+                data BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS positions (
+                position_id TEXT PRIMARY KEY,
+                data BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS skills (
+                candidate_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                years_experience REAL,
+                proficiency INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_skills_name ON skills (lower(name));
+            CREATE INDEX IF NOT EXISTS idx_skills_candidate ON skills (candidate_id);
+        """)
+
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed statements in a single SQLite transaction"""
+        with self._db_lock:
+            self._conn.execute("BEGIN")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
     def _load_data(self):
-        """Load data from JSON files"""
-        candidates_path = os.path.join(self.data_dir, "candidates.json")
-        positions_path = os.path.join(self.data_dir, "positions.json")
-        
-        if os.path.exists(candidates_path):
-            with open(candidates_path, 'r') as f:
-                candidates_data = json.load(f)
-                # Convert dict to Candidate objects
-                self.candidates = {cid: Candidate(**data) for cid, data in candidates_data.items()}
-        
-        if os.path.exists(positions_path):
-            with open(positions_path, 'r') as f:
-                positions_data = json.load(f)
-                # Convert dict to JobPosition objects
-                self.positions = {pid: JobPosition(**data) for pid, data in positions_data.items()}
-    
-    def _save_data(self):
-        """Save data to JSON files"""
-        candidates_path = os.path.join(self.data_dir, "candidates.json")
-        positions_path = os.path.join(self.data_dir, "positions.json")
-        
-        # Convert objects to dicts
-        candidates_data = {cid: self._candidate_to_dict(cand) for cid, cand in self.candidates.items()}
-        positions_data = {pid: self._position_to_dict(pos) for pid, pos in self.positions.items()}
-        
-        with open(candidates_path, 'w') as f:
-            json.dump(candidates_data, f, indent=2)
-        
-        with open(positions_path, 'w') as f:
-            json.dump(positions_data, f, indent=2)
-    
+        """Load data from the SQLite store, importing legacy JSON files on first run
+
+        Only candidate summaries are read here; full records load on demand.
+        """
+        self.candidates = LazyCandidates(self._fetch_candidate, self._candidate_changed)
+        skills: Dict[str, List[Tuple[str, float, int]]] = {}
+        for cid, name, years, prof in self._conn.execute(
+                "SELECT candidate_id, name, years_experience, proficiency FROM skills ORDER BY rowid"):
+            skills.setdefault(cid, []).append((sys.intern(name.lower()), years, prof))
+        for cid, status in self._conn.execute(
+                "SELECT candidate_id, status FROM candidates ORDER BY rowid"):
+            self.candidates.add_summary(cid, (status, skills.get(cid, [])))
+        self.positions = TrackedPositions(self._position_changed)
+        for pid, data in self._conn.execute("SELECT position_id, data FROM positions ORDER BY rowid"):
+            self.positions.load(pid, self._position_from_dict(orjson.loads(data)))
+
+        # user_version 1 records that the legacy JSON files have been imported
+        candidates_data, positions_data = {}, {}
+        (user_version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        legacy_import = user_version < 1
+        if legacy_import:
+            candidates_path = os.path.join(self.data_dir, "candidates.json")
+            positions_path = os.path.join(self.data_dir, "positions.json")
+            if os.path.exists(candidates_path):
+                with open(candidates_path, 'rb') as f:
+                    candidates_data = orjson.loads(f.read())
+            if os.path.exists(positions_path):
+                with open(positions_path, 'rb') as f:
+                    positions_data = orjson.loads(f.read())
+
+        self._skill_to_candidates = {}
+        for cid in self.candidates:
+            for name, _, _ in self.candidates.summary(cid)[1]:
+                self._skill_to_candidates.setdefault(name, set()).add(cid)
+
+        # Convert dicts to Candidate/JobPosition objects; imported records are
+        # queued as dirty and written by the flush below
+        for cid, data in candidates_data.items():
+            self.candidates[cid] = self._candidate_from_dict(data)
+        for pid, data in positions_data.items():
+            self.positions[pid] = self._position_from_dict(data)
+
+        if legacy_import:
+            self.flush()
+            with self._db_lock:
+                self._conn.execute("PRAGMA user_version = 1")
+
+        self._skill_matrix_stale = True
+
+    def _fetch_candidate(self, candidate_id: str) -> 'Candidate':
+        """Read one full candidate record from the database"""
+        with self._db_lock:
+            (data,) = self._conn.execute(
+                "SELECT data FROM candidates WHERE candidate_id = ?", (candidate_id,)
+            ).fetchone()
+        return self._candidate_from_dict(orjson.loads(data))
+
+    def _build_skill_matrix(self):
+        """Rebuild the dense candidate x skill matrices from the candidate summaries"""
+        self._cand_ids = list(self.candidates)
+        self._cand_row = {cid: row for row, cid in enumerate(self._cand_ids)}
+        self._skill_index = {}
+
+        summaries = [self.candidates.summary(cid) for cid in self._cand_ids]
+        rows, cols, prof, years = [], [], [], []
+        for row, summary in enumerate(summaries):
+            for name, skill_years, skill_prof in summary[1]:
+                rows.append(row)
+                cols.append(self._skill_index.setdefault(name, len(self._skill_index)))
+                prof.append(skill_prof)
+                years.append(skill_years)
+
+        self._skill_names = list(self._skill_index)
+        self._fuzzy_cache = {}
+        self._position_req = {}
+
+        shape = (len(self._cand_ids), len(self._skill_index))
+        self._prof_mat = np.zeros(shape, dtype=np.uint8)
+        self._years_mat = np.zeros(shape, dtype=np.uint8)
+        self._prof_mat[rows, cols] = np.clip(prof, 0, 255)
+        # Years are stored in tenths, capped at 10 years where the score saturates
+        self._years_mat[rows, cols] = np.clip(np.rint(np.asarray(years, dtype=np.float64) * 10), 0, 100)
+
+        self._row_start = np.zeros(len(self._cand_ids), dtype=np.intp)
+        self._row_len = np.zeros(len(self._cand_ids), dtype=np.intp)
+        self._exact_cols = np.zeros(len(cols), dtype=np.intp)
+        self._exact_prof = np.zeros(len(cols), dtype=np.float64)
+        self._exact_years = np.zeros(len(cols), dtype=np.float64)
+        self._exact_used = 0
+        for row, summary in enumerate(summaries):
+            self._append_exact_values(row, summary[1])
+
+        # Statuses aligned with the matrix rows, for vectorized filters
+        self._cand_df = pd.DataFrame({
+            'status': pd.Categorical(
+                [summary[0] for summary in summaries],
+                categories=[status.name for status in candidate_status]
+            ),
+        })
+
+        self._skill_matrix_stale = False
+
+    def _grow_skill_matrix(self, n_rows: int, n_cols: int):
+        """Make room for n_rows x n_cols, at least doubling a dimension that grows"""
+        cap_rows, cap_cols = self._prof_mat.shape
+        if n_rows <= cap_rows and n_cols <= cap_cols:
+            return
+        shape = (cap_rows if n_rows <= cap_rows else max(n_rows, 2 * cap_rows),
+                 cap_cols if n_cols <= cap_cols else max(n_cols, 2 * cap_cols))
+        for attr in ('_prof_mat', '_years_mat'):
+            grown = np.zeros(shape, dtype=np.uint8)
+            grown[:cap_rows, :cap_cols] = getattr(self, attr)
+            setattr(self, attr, grown)
+        if shape[0] != cap_rows:
+            self._cand_df = self._cand_df.reindex(range(shape[0]))
+            extra = np.zeros(shape[0] - cap_rows, dtype=np.intp)
+            self._row_start = np.concatenate([self._row_start, extra])
+            self._row_len = np.concatenate([self._row_len, extra])
+
+    def _append_exact_values(self, row: int, skills: List[Tuple[str, float, int]]):
+        """Point a row at a fresh copy of its skill values at the end of the exact-value pool
+
+        A replaced row's old entries stay unused in the pool until the next rebuild.
+        """
+        # Later duplicates of a name win, as in the matrices
+        values = {name: (years, prof) for name, years, prof in skills}
+        start, end = self._exact_used, self._exact_used + len(values)
+        if end > self._exact_cols.size:
+            size = max(end, 2 * self._exact_cols.size)
+            for attr in ('_exact_cols', '_exact_prof', '_exact_years'):
+                grown = np.zeros(size, dtype=getattr(self, attr).dtype)
+                grown[:start] = getattr(self, attr)[:start]
+                setattr(self, attr, grown)
+        self._exact_cols[start:end] = [self._skill_index[name] for name in values]
+        self._exact_prof[start:end] = [prof for _, prof in values.values()]
+        self._exact_years[start:end] = [years for years, _ in values.values()]
+        self._row_start[row] = start
+        self._row_len[row] = end - start
+        self._exact_used = end
+
+    def _store_matrix_row(self, candidate_id: str):
+        """Write a stored candidate into its matrix row, appending one if it is new"""
+        status, skills = self.candidates.summary(candidate_id)
+        row = self._cand_row.get(candidate_id)
+        replaced = row is not None
+        if not replaced:
+            row = self._cand_row[candidate_id] = len(self._cand_ids)
+            self._cand_ids.append(candidate_id)
+
+        new_names = [name for name in dict.fromkeys(name for name, _, _ in skills)
+                     if name not in self._skill_index]
+        for name in new_names:
+            self._skill_index[name] = len(self._skill_names)
+            self._skill_names.append(name)
+        self._grow_skill_matrix(len(self._cand_ids), len(self._skill_names))
+
+        cols = np.array([self._skill_index[name] for name, _, _ in skills], dtype=np.intp)
+        self._prof_mat[row] = 0
+        self._years_mat[row] = 0
+        self._prof_mat[row, cols] = np.clip([prof for _, _, prof in skills], 0, 255)
+        self._years_mat[row, cols] = np.clip(
+            np.rint(np.asarray([years for _, years, _ in skills], dtype=np.float64) * 10), 0, 100)
+        self._cand_df.at[row, 'status'] = status
+        self._append_exact_values(row, skills)
+
+        if new_names:
+            self._extend_fuzzy_cache(new_names)
+        if new_names or replaced:
+            # Required skill groups or pool membership may have changed
+            self._position_req = {}
+            return
+        # A new row only joins the pools of positions it has a matched skill for
+        for position_id, req in self._position_req.items():
+            if np.isin(req[2], cols).any():
+                self._position_req[position_id] = req[:4] + (np.append(req[4], row),)
+
+    def _drop_matrix_row(self, candidate_id: str):
+        """Blank a removed candidate's row; the status filter excludes it from matches"""
+        row = self._cand_row.pop(candidate_id, None)
+        if row is None:
+            return
+        self._prof_mat[row] = 0
+        self._years_mat[row] = 0
+        self._row_len[row] = 0
+        self._cand_df.at[row, 'status'] = np.nan
+
+    def _extend_fuzzy_cache(self, new_names: List[str]):
+        """Add new vocabulary entries to the cached groups of names they fuzzy match"""
+        cached = list(self._fuzzy_cache)
+        if not cached:
+            return
+        similarity = process.cdist(cached, new_names, scorer=fuzz.token_set_ratio,
+                                   score_cutoff=SKILL_MATCH_CUTOFF, workers=-1)
+        for name, row in zip(cached, similarity):
+            hits = [self._skill_index[new] for new, score in zip(new_names, row)
+                    if score or new == name]
+            if hits:
+                self._fuzzy_cache[name] = np.union1d(self._fuzzy_cache[name], hits).astype(np.intp)
+
+    def _resolve_skills(self, names: List[str]) -> List[np.ndarray]:
+        """Map skill names to the matrix columns of fuzzy-matching vocabulary entries"""
+        missing = [name for name in dict.fromkeys(names) if name not in self._fuzzy_cache]
+        if missing:
+            similarity = process.cdist(missing, self._skill_names, scorer=fuzz.token_set_ratio,
+                                       score_cutoff=SKILL_MATCH_CUTOFF, workers=-1)
+            for name, row in zip(missing, similarity):
+                cols = set(np.flatnonzero(row).tolist())
+                # Exact matches always count, including names the scorer rejects (e.g. "")
+                if name in self._skill_index:
+                    cols.add(self._skill_index[name])
+                self._fuzzy_cache[name] = np.array(sorted(cols), dtype=np.intp)
+        return [self._fuzzy_cache[name] for name in names]
+
+    def _position_requirements(self, position: 'JobPosition') -> Tuple:
+        """Resolve a position's required skills against the current skill matrix
+
+        Returns (req_names, req_group_names, matched_cols, group_ptr, pool_rows):
+        each required skill maps to the group of vocabulary entries it fuzzy
+        matches, and pool_rows are the candidates with any of them. The result
+        is cached per position until the matrix is rebuilt.
+        """
+        req = self._position_req.get(position.position_id)
+        if req is None:
+            req_names = [s._name_lc for s in position.required_skills]
+            req_groups = self._resolve_skills(req_names)
+            req_group_names = [frozenset(self._skill_names[col] for col in group) for group in req_groups]
+            groups = [g for g in req_groups if g.size]
+            matched_cols = np.concatenate(groups) if groups else np.zeros(0, dtype=np.intp)
+            group_ptr = np.cumsum([0] + [g.size for g in groups])
+            # Matrix rows of candidates having at least one matched skill
+            candidate_pool = set().union(*(self._skill_to_candidates.get(self._skill_names[col], ())
+                                           for col in matched_cols))
+            pool_rows = np.sort(np.fromiter((self._cand_row[cid] for cid in candidate_pool),
+                                            dtype=np.intp, count=len(candidate_pool)))
+            req = (req_names, req_group_names, matched_cols, group_ptr, pool_rows)
+            self._position_req[position.position_id] = req
+        return req
+
+    @staticmethod
+    def _skill_score(proficiency: int, years_experience: float) -> float:
+        """Score a candidate skill; higher for better proficiency and more experience"""
+        return (proficiency / 5) * 0.6 + min(years_experience / 10, 1) * 0.4
+
+    def _candidate_changed(self, candidate_id: str, previous: Optional[CandidateSummary]):
+        """Change listener for the candidate mapping: reindex and queue the row"""
+        stored = candidate_id in self.candidates
+        if stored and previous is not None and previous[1] == self.candidates.summary(candidate_id)[1]:
+            # Same skills, so only the status can matter for matching
+            if not self._skill_matrix_stale and candidate_id in self._cand_row:
+                self._cand_df.at[self._cand_row[candidate_id], 'status'] = \
+                    self.candidates.summary(candidate_id)[0]
+            self._mark_dirty(candidate_id=candidate_id)
+            return
+        if previous is not None:
+            for name, _, _ in previous[1]:
+                holders = self._skill_to_candidates.get(name)
+                if holders is not None:
+                    holders.discard(candidate_id)
+                    if not holders:
+                        del self._skill_to_candidates[name]
+        if stored:
+            for name, _, _ in self.candidates.summary(candidate_id)[1]:
+                self._skill_to_candidates.setdefault(name, set()).add(candidate_id)
+        if not self._skill_matrix_stale:
+            if stored:
+                self._store_matrix_row(candidate_id)
+            else:
+                self._drop_matrix_row(candidate_id)
+        # flush() deletes the rows of queued ids that are no longer stored
+        self._mark_dirty(candidate_id=candidate_id)
+
+    def _save_candidate(self, candidate: 'Candidate'):
+        """Insert or update a single candidate row and its skills"""
+        self._conn.execute(
+            "INSERT INTO candidates (candidate_id, status, data) VALUES (?, ?, ?) "
+            "ON CONFLICT (candidate_id) DO UPDATE SET status = excluded.status, data = excluded.data",
+            (candidate.candidate_id, candidate.status.name,
+             orjson.dumps(self._candidate_to_dict(candidate)))
+        )
+        self._conn.execute("DELETE FROM skills WHERE candidate_id = ?", (candidate.candidate_id,))
+        self._conn.executemany(
+            "INSERT INTO skills (candidate_id, name, years_experience, proficiency) VALUES (?, ?, ?, ?)",
+            [(candidate.candidate_id, s.name, s.years_experience, s.proficiency) for s in candidate.skills]
+        )
+
+    def _delete_candidate(self, candidate_id: str):
+        """Remove a candidate row and its skills"""
+        self._conn.execute("DELETE FROM candidates WHERE candidate_id = ?", (candidate_id,))
+        self._conn.execute("DELETE FROM skills WHERE candidate_id = ?", (candidate_id,))
+
+    def _save_position(self, position: 'JobPosition'):
+        """Insert or update a single position row"""
+        self._conn.execute(
+            "INSERT INTO positions (position_id, data) VALUES (?, ?) "
+            "ON CONFLICT (position_id) DO UPDATE SET data = excluded.data",
+            (position.position_id, orjson.dumps(self._position_to_dict(position)))
+        )
+
+    def _delete_position(self, position_id: str):
+        """Remove a position row"""
+        self._conn.execute("DELETE FROM positions WHERE position_id = ?", (position_id,))
+
+    def _position_changed(self, position_id: str):
+        """Change listener for the position mapping: drop cached requirements and queue the row"""
+        self._position_req.pop(position_id, None)
+        # flush() deletes the rows of queued ids that are no longer stored
+        self._mark_dirty(position_id=position_id)
+
+    def _mark_dirty(self, candidate_id: Optional[str] = None, position_id: Optional[str] = None):
+        """Queue a candidate and/or position row for the next flush"""
+        with self._db_lock:
+            if self._closed:
+                raise RuntimeError("HRAssistant is closed")
+            if candidate_id is not None:
+                self._dirty_candidates[candidate_id] = None
+            if position_id is not None:
+                self._dirty_positions[position_id] = None
+            if self._bulk_depth or self._save_pending:
+                return
+            self._save_pending = True
+            self._flush_timer = threading.Timer(FLUSH_DELAY, self._flush_from_timer)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """Write all dirty candidate and position rows in one transaction"""
+        with self._db_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._save_pending = False
+            if not self._dirty_candidates and not self._dirty_positions:
+                return
+            with self._transaction():
+                for candidate_id in self._dirty_candidates:
+                    if candidate_id in self.candidates:
+                        self._save_candidate(self.candidates[candidate_id])
+                    else:
+                        self._delete_candidate(candidate_id)
+                for position_id in self._dirty_positions:
+                    if position_id in self.positions:
+                        self._save_position(self.positions[position_id])
+                    else:
+                        self._delete_position(position_id)
+            self._dirty_candidates.clear()
+            self._dirty_positions.clear()
+
+    def _flush_from_timer(self):
+        """Debounce timer callback; leaves writes to bulk() exit while a block is open"""
+        with self._db_lock:
+            if self._bulk_depth or self._closed:
+                self._save_pending = False
+                return
+            self.flush()
+
+    @contextmanager
+    def bulk(self):
+        """Suppress writes inside the block and flush once on exit
+
+        Example:
+            with hr.bulk():
+                for data in rows:
+                    hr.add_candidate(data)
+        """
+        with self._db_lock:
+            self._bulk_depth += 1
+            # A flush scheduled before the block would write part of the batch
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+                self._save_pending = False
+        try:
+            yield self
+        finally:
+            with self._db_lock:
+                self._bulk_depth -= 1
+                if not self._bulk_depth:
+                    self.flush()
+
+    def _open_smtp(self) -> smtplib.SMTP:
+        """Open a new SMTP connection and authenticate it"""
+        smtp = smtplib.SMTP(self.smtp_config['server'], self.smtp_config.get('port', 587),
+                            timeout=self.smtp_config.get('timeout', SMTP_TIMEOUT))
+        smtp.starttls()
+        smtp.login(self.smtp_config['username'], self.smtp_config['password'])
+        return smtp
+
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Take an idle pooled SMTP connection, opening one while the pool has room
+
+        Blocks until a slot is free when every connection is in use.
+        """
+        self._smtp_slots.acquire()
+        try:
+            return self._smtp_pool.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._open_smtp()
+        except BaseException:
+            self._smtp_slots.release()
+            raise
+
+    def _release_smtp(self, smtp: smtplib.SMTP):
+        """Return a healthy SMTP connection to the pool"""
+        self._smtp_pool.put(smtp)
+        self._smtp_slots.release()
+
+    def _discard_smtp(self, smtp: smtplib.SMTP):
+        """Drop a broken SMTP connection and free its pool slot"""
+        try:
+            smtp.close()
+        except Exception:
+            pass
+        self._smtp_slots.release()
+
+    def send_email(self, to_email: str, subject: str, body: str) -> bool:
+        """Send a plain-text email, reusing a pooled SMTP connection"""
+        if not self.smtp_config:
+            return False
+
+        msg = MIMEMultipart()
+        msg['From'] = self.smtp_config['from_email']
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'plain'))
+
+        smtp = self._get_smtp()
+        for attempt in range(2):
+            try:
+                smtp.sendmail(msg['From'], [to_email], msg.as_string())
+            except smtplib.SMTPServerDisconnected:
+                if attempt:
+                    self._discard_smtp(smtp)
+                    raise
+                # The server closed an idle connection; retry once on a newly
+                # opened one (not another idle one, which may be stale too),
+                # keeping the pool slot
+                try:
+                    smtp.close()
+                except Exception:
+                    pass
+                try:
+                    smtp = self._open_smtp()
+                except BaseException:
+                    self._smtp_slots.release()
+                    raise
+                continue
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused,
+                    smtplib.SMTPDataError):
+                # The message was rejected but the session is still usable
+                self._release_smtp(smtp)
+                raise
+            except Exception:
+                self._discard_smtp(smtp)
+                raise
+            self._release_smtp(smtp)
+            return True
+
+    def close(self):
+        """Flush pending writes and close SMTP and SQLite connections"""
+        if self._closed:
+            return
+        while True:
+            try:
+                smtp = self._smtp_pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+        self.flush()
+        with self._db_lock:
+            self._closed = True
+            self._conn.close()
+        _open_assistants.discard(self)
+
     def _candidate_to_dict(self, candidate: 'Candidate') -> Dict:
-        """Convert Candidate object to dictionary with proper status handling"""
-        # Handle status - it might be an enum or a string
-        status = candidate.status
-        if hasattr(status, 'name'):  # It's an enum
-            status_str = status.name
-        else:  # It's already a string
-            status_str = str(status)
-            
-        # Safely get attributes with defaults
+        """Convert Candidate object to dictionary"""
         return {
-            'candidate_id': getattr(candidate, 'candidate_id', ''),
-            'first_name': getattr(candidate, 'first_name', ''),
-            'last_name': getattr(candidate, 'last_name', ''),
-            'email': getattr(candidate, 'email', ''),
-            'phone': getattr(candidate, 'phone', ''),
-            'status': status_str,
-            'application_date': getattr(candidate, 'application_date', ''),
-            'resume_path': getattr(candidate, 'resume_path', ''),
-            'notes': getattr(candidate, 'notes', []),
-            'skills': [{'name': getattr(s, 'name', ''), 
-                       'years_experience': getattr(s, 'years_experience', 0), 
-                       'proficiency': getattr(s, 'proficiency', 0)} 
-                      for s in getattr(candidate, 'skills', [])],
-            'education': [{'degree': getattr(e, 'degree', ''), 
-                          'field': getattr(e, 'field', ''), 
-                          'institution': getattr(e, 'institution', ''), 
-                          'year_completed': getattr(e, 'year_completed', 0), 
-                          'gpa': getattr(e, 'gpa', None)} 
-                         for e in getattr(candidate, 'education', [])],
-            'experience': [{'title': getattr(exp, 'title', ''), 
-                           'company': getattr(exp, 'company', ''), 
-                           'start_date': getattr(exp, 'start_date', ''),
-                           'end_date': getattr(exp, 'end_date', '') or "", 
-                           'description': getattr(exp, 'description', ''),
-                           'achievements': getattr(exp, 'achievements', [])}
-                          for exp in getattr(candidate, 'experience', [])]
+            'candidate_id': candidate.candidate_id,
+            'first_name': candidate.first_name,
+            'last_name': candidate.last_name,
+            'email': candidate.email,
+            'phone': candidate.phone,
+            'status': candidate.status.name,
+            'application_date': candidate.application_date,
+            'resume_path': candidate.resume_path,
+            'notes': candidate.notes,
+            'skills': [{'name': s.name, 
+                       'years_experience': s.years_experience, 
+                       'proficiency': s.proficiency} 
+                      for s in candidate.skills],
+            'education': [{'degree': e.degree, 
+                          'field': e.field, 
+                          'institution': e.institution, 
+                          'year_completed': e.year_completed, 
+                          'gpa': e.gpa} 
+                         for e in candidate.education],
+            'experience': [{'title': exp.title, 
+                           'company': exp.company, 
+                           'start_date': exp.start_date,
+                           'end_date': exp.end_date or "", 
+                           'description': exp.description,
+                           'achievements': exp.achievements}
+                          for exp in candidate.experience]
         }
     
+    def _candidate_from_dict(self, data: Dict) -> 'Candidate':
+        """Build a Candidate, including nested records, from its stored dictionary"""
+        return Candidate(
+            candidate_id=data['candidate_id'],
+            first_name=data['first_name'],
+            last_name=data['last_name'],
+            email=data['email'],
+            phone=data['phone'],
+            skills=[Skill(s['name'], s['years_experience'], s['proficiency'])
+                    for s in data.get('skills', [])],
+            education=[Education(e['degree'], e['field'], e['institution'],
+                                 e['year_completed'], e.get('gpa'))
+                       for e in data.get('education', [])],
+            experience=[WorkExperience(exp['title'], exp['company'], exp['start_date'],
+                                       exp.get('end_date') or None, exp['description'],
+                                       exp.get('achievements', []))
+                        for exp in data.get('experience', [])],
+            status=candidate_status[data['status']],
+            application_date=data['application_date'],
+            notes=data.get('notes', []),
+            resume_path=data.get('resume_path')
+        )
+
+    def _position_from_dict(self, data: Dict) -> 'JobPosition':
+        """Build a JobPosition from its stored dictionary"""
+        return JobPosition(
+            position_id=data['position_id'],
+            title=data['title'],
+            department=data['department'],
+            location=data['location'],
+            experience_level=experience_level[data['experience_level']],
+            description=data['description'],
+            required_skills=[Skill(s['name'], s['years_experience'], s['proficiency'])
+                             for s in data.get('required_skills', [])],
+            preferred_skills=[Skill(s['name'], s['years_experience'], s['proficiency'])
+                              for s in data.get('preferred_skills', [])],
+            status=job_status[data['status']],
+            hiring_manager=data.get('hiring_manager') or None,
+            salary_range=data.get('salary_range') or None,
+            open_date=data['open_date'],
+            close_date=data.get('close_date') or None
+        )
+
     def _position_to_dict(self, position: 'JobPosition') -> Dict:
-        """Convert JobPosition object to dictionary with proper type handling"""
-        # Handle experience_level - it might be an enum or a string
-        exp_level = position.experience_level
-        if hasattr(exp_level, 'name'):  # It's an enum
-            exp_level_str = exp_level.name
-        else:  # It's already a string
-            exp_level_str = str(exp_level)
-        # Handle status - it might be an enum or a string
-        status = position.status
-        if hasattr(status, 'name'):  # It's an enum
-            status_str = status.name
-        else:  # It's already a string
-            status_str = str(status)
-        
-        # Safely get attributes with defaults
+        """Convert JobPosition object to dictionary"""
         return {
-            'position_id': getattr(position, 'position_id', ''),
-            'title': getattr(position, 'title', ''),
-            'department': getattr(position, 'department', ''),
-            'location': getattr(position, 'location', ''),
-            'experience_level': exp_level_str,
-            'description': getattr(position, 'description', ''),
-            'required_skills': [{'name': getattr(s, 'name', ''), 
-                               'years_experience': getattr(s, 'years_experience', 0), 
-                               'proficiency': getattr(s, 'proficiency', 0)}
-                              for s in getattr(position, 'required_skills', [])],
-            'preferred_skills': [{'name': getattr(s, 'name', ''), 
-                                'years_experience': getattr(s, 'years_experience', 0), 
-                                'proficiency': getattr(s, 'proficiency', 0)}
-                               for s in getattr(position, 'preferred_skills', [])],
-            'status': status_str,
-            'hiring_manager': getattr(position, 'hiring_manager', '') or "",
-            'salary_range': getattr(position, 'salary_range', None) or {},
-            'open_date': getattr(position, 'open_date', ''),
-            'close_date': getattr(position, 'close_date', '') or ""
+            'position_id': position.position_id,
+            'title': position.title,
+            'department': position.department,
+            'location': position.location,
+            'experience_level': position.experience_level.name,
+            'description': position.description,
+            'required_skills': [{'name': s.name, 
+                               'years_experience': s.years_experience, 
+                               'proficiency': s.proficiency}
+                              for s in position.required_skills],
+            'preferred_skills': [{'name': s.name, 
+                                'years_experience': s.years_experience, 
+                                'proficiency': s.proficiency}
+                               for s in position.preferred_skills],
+            'status': position.status.name,
+            'hiring_manager': position.hiring_manager or "",
+            'salary_range': position.salary_range or {},
+            'open_date': position.open_date,
+            'close_date': position.close_date or ""
         }
     
     def add_candidate(self, candidate_data: Dict) -> str:
         """Add a new candidate to the system"""
-        candidate_id = f"CAN-{str(uuid.uuid4())[:8].upper()}"
+        candidate_id = f"CAN-{uuid.uuid4().hex[:8].upper()}"
         candidate = Candidate(
             candidate_id=candidate_id,
             **candidate_data
         )
         self.candidates[candidate_id] = candidate
-        self._save_data()
         return candidate_id
     
     def create_job_position(self, position_data: Dict) -> str:
         """Create a new job position"""
-        position_id = f"POS-{str(uuid.uuid4())[:8].upper()}"
+        position_id = f"POS-{uuid.uuid4().hex[:8].upper()}"
         position = JobPosition(
             position_id=position_id,
             **position_data
         )
         self.positions[position_id] = position
-        self._save_data()
         return position_id
+
+    def save_candidate(self, candidate: 'Candidate'):
+        """Save in-place edits to a candidate (notes, contact details, skills, status, ...)
+
+        Edited fields are written and seen by matching once the candidate is saved.
+        """
+        self.candidates[candidate.candidate_id] = candidate
+
+    def save_position(self, position: 'JobPosition'):
+        """Save in-place edits to a job position"""
+        self.positions[position.position_id] = position
     
     def get_candidate_matches(self, position_id: str, top_n: int = 5) -> List[Dict]:
         """Find the best matching candidates for a position"""
@@ -253,64 +1004,105 @@ class HRAssistant:
             return []
         
         position = self.positions[position_id]
-        required_skills = {s.name.lower() for s in position.required_skills}
-        
+        if not position.required_skills or top_n <= 0:
+            return []
+
+        if self._skill_matrix_stale:
+            self._build_skill_matrix()
+
+        req_names, req_group_names, matched_cols, group_ptr, pool_rows = \
+            self._position_requirements(position)
+
+        open_statuses = ['APPLIED', 'SCREENING']
+        while True:
+            # Only consider open candidates who have at least one required skill
+            open_mask = self._cand_df['status'].isin(open_statuses).to_numpy()
+            rows = pool_rows[open_mask[pool_rows]]
+            if not rows.size:
+                return []
+
+            # Normalize score to 0-100; proficiency is at least 1, so a zero
+            # total means no matched skill and the row is a stale pool entry
+            totals = _score_rows(self._prof_mat, self._years_mat, rows, matched_cols, group_ptr)
+            totals *= 100 / len(position.required_skills)
+            scored = totals > 0
+            rows, totals = rows[scored], totals[scored]
+            if not rows.size:
+                return []
+
+            # The matrix keeps years in tenths, so each matched group can be off by
+            # up to 0.002 (plus float32 rounding). Rescore every row within that
+            # margin of the top_n cut-off exactly, then take the top_n by rounded
+            # score; ties keep candidate order (rows are ascending) like a stable sort
+            k = min(top_n, rows.size)
+            kth = np.partition(totals, rows.size - k)[rows.size - k]
+            margin = (2 * 0.0021 * (group_ptr.size - 1) + 1e-4) * 100 / len(position.required_skills)
+            near = np.flatnonzero(totals >= kth - margin)
+            exact = _exact_score_rows(self._row_start, self._row_len, self._exact_cols,
+                                      self._exact_prof, self._exact_years, rows[near],
+                                      matched_cols, group_ptr)
+            exact = (exact / len(position.required_skills)) * 100
+            # round() per distinct value: numpy rounding differs at some halves
+            distinct, inverse = np.unique(exact, return_inverse=True)
+            scores = np.array([round(total, 1) for total in distinct.tolist()])[inverse]
+            order = np.lexsort((near, -scores))[:k]
+            top, scores = near[order], scores[order]
+
+            # The frame holds stored statuses; a record edited in place since
+            # may have closed. Sync those rows and select again without them
+            closed = [row for row in rows[top]
+                      if self.candidates[self._cand_ids[row]].status.name not in open_statuses]
+            if not closed:
+                break
+            for row in closed:
+                self._cand_df.at[row, 'status'] = self.candidates[self._cand_ids[row]].status.name
+
         matches = []
-        
-        for candidate in self.candidates.values():
-            if candidate.status not in [candidate_status.APPLIED, candidate_status.SCREENING]:
-                continue
-                
-            candidate_skills = {s.name.lower(): s for s in candidate.skills}
-            
-            # Calculate match score
-            match_score = 0
+        for i, score in zip(top, scores):
+            candidate = self.candidates[self._cand_ids[rows[i]]]
+            # Skills as scored, i.e. as of the last time the candidate was stored
+            candidate_skills = {name: (prof, years) for name, years, prof
+                                in self.candidates.summary(candidate.candidate_id)[1]}
+
             matched_skills = []
-            
-            # Check required skills
-            for req_skill in position.required_skills:
-                skill_name = req_skill.name.lower()
-                if skill_name in candidate_skills:
-                    candidate_skill = candidate_skills[skill_name]
-                    # Higher score for better proficiency and more experience
-                    skill_score = (candidate_skill.proficiency / 5) * 0.6
-                    skill_score += min(candidate_skill.years_experience / 10, 1) * 0.4
-                    match_score += skill_score
+            for skill_name, group_names in zip(req_names, req_group_names):
+                matched = group_names & candidate_skills.keys()
+                if matched:
+                    # Best-scoring similar skill; name breaks ties deterministically
+                    best = max(matched, key=lambda name: (
+                        self._skill_score(*candidate_skills[name]), name))
+                    proficiency, years = candidate_skills[best]
+                    skill_score = self._skill_score(proficiency, years)
                     matched_skills.append({
                         'skill': skill_name,
                         'match': f"{int(skill_score * 100)}%",
-                        'years': candidate_skill.years_experience,
-                        'proficiency': candidate_skill.proficiency
+                        'years': years,
+                        'proficiency': proficiency
                     })
-            
-            # Only consider candidates who have at least one required skill
-            if matched_skills:
-                # Normalize score to 0-100
-                normalized_score = (match_score / len(position.required_skills)) * 100
-                
-                matches.append({
-                    'candidate_id': candidate.candidate_id,
-                    'name': f"{candidate.first_name} {candidate.last_name}",
-                    'email': candidate.email,
-                    'match_score': round(normalized_score, 1),
-                    'matched_skills': matched_skills,
-                    'status': candidate.status.name,
-                    'application_date': candidate.application_date
-                })
-        
-        # Sort by match score in descending order
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
-        
-        return matches[:top_n]
+
+            matches.append({
+                'candidate_id': candidate.candidate_id,
+                'name': f"{candidate.first_name} {candidate.last_name}",
+                'email': candidate.email,
+                'match_score': float(score),
+                'matched_skills': matched_skills,
+                'status': candidate.status.name,
+                'application_date': candidate.application_date
+            })
+
+        return matches
     
     def schedule_interview(self, candidate_id: str, position_id: str, 
-                          interviewer: str, scheduled_time: str) -> bool:
-        """Schedule an interview for a candidate"""
+                          interviewer: str, scheduled_time: str, notify: bool = False) -> bool:
+        """Schedule an interview for a candidate
+
+        Set notify=True to also email the candidate (requires smtp_config).
+        """
         if candidate_id not in self.candidates or position_id not in self.positions:
             return False
         
         # In a real app, you would integrate with a calendar API here
-        interview_id = f"INT-{str(uuid.uuid4())[:8].upper()}"
+        interview_id = f"INT-{uuid.uuid4().hex[:8].upper()}"
         interview = {
             'interview_id': interview_id,
             'candidate_id': candidate_id,
@@ -322,16 +1114,48 @@ class HRAssistant:
             'created_at': datetime.now().isoformat()
         }
         
-        self.interviews.append(interview)
-        self.candidates[candidate_id].status = candidate_status.INTERVIEW_SCHEDULED
-        self._save_data()
+        self.interviews[interview_id] = interview
+        self._interviews_by_candidate.setdefault(candidate_id, []).append(interview_id)
+        self._interviews_by_position.setdefault(position_id, []).append(interview_id)
+        candidate = self.candidates[candidate_id]
+        candidate.status = candidate_status.INTERVIEW_SCHEDULED
+        self.save_candidate(candidate)
         
         # In a real app, send calendar invites here
         print(f"Interview scheduled for {self.candidates[candidate_id].first_name} "
               f"with {interviewer} on {scheduled_time}")
+
+        if notify and self.smtp_config:
+            candidate = self.candidates[candidate_id]
+            try:
+                self.send_email(
+                    candidate.email,
+                    f"Interview scheduled: {self.positions[position_id].title}",
+                    f"Dear {candidate.first_name},\n\n"
+                    f"Your interview with {interviewer} is scheduled for {scheduled_time}.\n"
+                )
+            except (smtplib.SMTPException, OSError) as e:
+                print(f"Could not send interview notification: {e}")
         
         return True
 
+    def get_interviews_for(self, candidate_id: str) -> List[Dict]:
+        """Get all interviews scheduled for a candidate"""
+        return [self.interviews[iid] for iid in self._interviews_by_candidate.get(candidate_id, [])]
+
+    def get_position_interviews(self, position_id: str) -> List[Dict]:
+        """Get all interviews scheduled for a position"""
+        return [self.interviews[iid] for iid in self._interviews_by_position.get(position_id, [])]
+
+# Assistants still open at interpreter exit are flushed and closed. A WeakSet
+# keeps this from holding every HRAssistant alive for the life of the process.
+_open_assistants: 'weakref.WeakSet[HRAssistant]' = weakref.WeakSet()
+
+@atexit.register
+def _close_open_assistants():
+    for hr in list(_open_assistants):
+        hr.close()
+
 def main():
     """Example usage of the HR Assistant"""
     # Initialize the HR Assistant